@@ -7,22 +7,47 @@ Core MC calculation uses ERA5 only (reliable baseline).
 Open-Meteo shows directional trend for most recent days.
 """
 
+import asyncio
+import hashlib
+import io
 import json
-import subprocess
+import os
 import sys
 import math
-import random
+import re
+import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 import statistics
-import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# ijson's parse errors don't subclass ValueError, so the cache layer has
+# to catch both when deciding a body is unparseable
+_PARSE_ERRORS = (ValueError,) if ijson is None else (ValueError, ijson.common.JSONError)
 
 # Configuration
 ERA5_URL = "https://climatereanalyzer.org/clim/t2_daily/json/era5_world_t2_day.json"
 ONI_URL = "https://www.cpc.ncep.noaa.gov/data/indices/oni.ascii.txt"
 GAMMA_API = "https://gamma-api.polymarket.com"
 STATE_FILE = Path("/home/ubuntu/clawd/polymarket/climate_state_v3.json")
+CACHE_DIR = Path.home() / ".cache" / "climate_edge"
+
+# Cache TTLs per source (how often upstream actually changes)
+ERA5_TTL = 6 * 3600       # updated daily
+ONI_TTL = 24 * 3600       # updated monthly
+POLYMARKET_TTL = 60       # live odds
 
 # Open-Meteo sampling grid (representative global points)
 SAMPLE_GRID = [
@@ -36,6 +61,10 @@ SAMPLE_GRID = [
     (60, -100), (60, 100),
 ]
 
+# Area weights for SAMPLE_GRID, computed once at import (cos of latitude)
+_GRID_LAT = np.array([lat for lat, _ in SAMPLE_GRID], dtype=np.float32)
+_GRID_WEIGHTS = np.cos(np.deg2rad(_GRID_LAT))
+
 WARMING_TREND_PER_YEAR = 0.02
 REFERENCE_YEAR = 2000
 
@@ -49,91 +78,219 @@ HISTORICAL_RANKINGS = {
 }
 
 
-def fetch_json(url: str, headers: Dict = None) -> Optional[any]:
-    default_headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; ClimateBot/3.0)",
-        "Accept": "application/json"
-    }
-    if headers:
-        default_headers.update(headers)
-    
-    header_args = " ".join([f'-H "{k}: {v}"' for k, v in default_headers.items()])
-    cmd = f'curl -s {header_args} "{url}"'
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        return None
+# One pooled session for every sync fetch: sockets and TLS are reused
+# across the ERA5 + ONI + Polymarket calls, with retries on flaky upstreams
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (compatible; ClimateBot/3.0)",
+    "Accept": "application/json"
+})
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                       max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
+def _async_client() -> httpx.AsyncClient:
+    """Async client for the fetch coroutines.
+
+    HTTP/2 multiplexes every logical request over a handful of keep-alive
+    connections, which plays nicer with Open-Meteo's per-IP limits than
+    parallel sockets would.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=15,
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        headers=dict(SESSION.headers),
+    )
+
+
+def _write_atomic(path: Path, content: str):
+    """Write via tmp + os.replace so readers never see half a body."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+def cached_fetch(url: str, ttl_seconds: int, parser=json.loads) -> Optional[any]:
+    """Fetch a URL through an on-disk cache with per-URL TTL.
+
+    Fresh entries are served from ~/.cache/climate_edge without touching
+    the network. Once stale, the fetch revalidates with If-None-Match /
+    If-Modified-Since, so an unchanged upstream costs a ~200-byte 304
+    instead of the full body. On fetch failure the stale body is
+    returned as fallback so the tool still produces output when an
+    upstream is down.
+    """
+    key = hashlib.blake2b(url.encode()).hexdigest()
+    body_file = CACHE_DIR / f"{key}.json"
+    meta_file = CACHE_DIR / f"{key}.meta"
+
+    def _read_cached():
+        try:
+            return parser(body_file.read_text())
+        except (OSError,) + _PARSE_ERRORS:
+            return None
+
+    # Serve from cache while fresh
     try:
-        return json.loads(result.stdout)
-    except:
-        return None
-
-
-def fetch_text(url: str) -> Optional[str]:
-    cmd = f'curl -s "{url}"'
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    return result.stdout if result.returncode == 0 else None
-
+        meta = json.loads(meta_file.read_text())
+    except (OSError, ValueError):
+        meta = None
+    if meta and time.time() < meta.get("stale_at", 0):
+        cached = _read_cached()
+        if cached is not None:
+            return cached
+
+    # Stale (or missing): revalidate against upstream's cache headers
+    cond_headers = {}
+    if meta and body_file.exists():
+        if meta.get("etag"):
+            cond_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            cond_headers["If-Modified-Since"] = meta["last_modified"]
 
-def fetch_era5_data() -> Dict[str, List[float]]:
-    """Fetch ERA5 data from Climate Reanalyzer."""
-    print("Fetching ERA5 data...")
-    data = fetch_json(ERA5_URL)
-    if not data:
-        return {}
-    
+    try:
+        resp = SESSION.get(url, headers=cond_headers, timeout=15)
+    except requests.RequestException:
+        resp = None
+
+    now = time.time()
+    if resp is not None and resp.status_code == 304:
+        cached = _read_cached()
+        if cached is not None:
+            # Body unchanged upstream: just extend freshness
+            meta["fetched"] = now
+            meta["stale_at"] = now + ttl_seconds
+            _write_atomic(meta_file, json.dumps(meta))
+            return cached
+        # 304 but the cached body is unreadable: refetch unconditionally
+        # so a corrupt cache entry can't wedge the fetcher until the
+        # upstream ETag changes
+        try:
+            resp = SESSION.get(url, timeout=15)
+        except requests.RequestException:
+            resp = None
+
+    if resp is not None and resp.ok and resp.text:
+        try:
+            parsed = parser(resp.text)
+        except _PARSE_ERRORS:
+            parsed = None
+        if parsed is not None:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _write_atomic(body_file, resp.text)
+            _write_atomic(meta_file, json.dumps({
+                "fetched": now,
+                "stale_at": now + ttl_seconds,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }))
+            return parsed
+
+    # Network failed: fall back to the stale body if we have one
+    return _read_cached()
+
+
+def _series_to_row(data: List) -> np.ndarray:
+    """Materialize one year of daily temps as float32 with NaN for gaps."""
+    return np.array([np.nan if t is None else float(t) for t in data],
+                    dtype=np.float32)
+
+
+def _parse_era5_series(body: str) -> Dict[str, np.ndarray]:
+    """Parse the multi-MB ERA5 payload into {year: float32 daily temps}.
+
+    With ijson available, series stream through one at a time and the
+    non-year entries (means, percentiles) are skipped without ever being
+    materialized; otherwise fall back to a plain json.loads pass. Either
+    way each year lands directly in a compact float32 array (NaN for
+    missing days) instead of a list of boxed floats.
+    """
     result = {}
-    for series in data:
+    if ijson is not None:
+        # ijson wants a byte stream; feeding it text triggers a deprecated
+        # (and slow) internal re-encode
+        for series in ijson.items(io.BytesIO(body.encode()), "item"):
+            name = series.get("name", "")
+            if name.isdigit():
+                result[name] = _series_to_row(series.get("data", []))
+        return result
+
+    for series in json.loads(body):
         name = series.get("name", "")
         if name.isdigit():
-            result[name] = [t if t is not None else None for t in series.get("data", [])]
+            result[name] = _series_to_row(series.get("data", []))
     return result
 
 
-def fetch_openmeteo_recent() -> Dict[str, float]:
-    """Fetch recent global temp estimates from Open-Meteo (last 7 days)."""
+def fetch_era5_data() -> Dict[str, np.ndarray]:
+    """Fetch ERA5 data from Climate Reanalyzer."""
+    print("Fetching ERA5 data...")
+    return cached_fetch(ERA5_URL, ERA5_TTL, parser=_parse_era5_series) or {}
+
+
+async def fetch_openmeteo_recent_async() -> Dict[str, float]:
+    """Fetch recent global temp estimates from Open-Meteo (last 7 days).
+
+    All grid points go out as one multi-location request (comma-separated
+    latitude/longitude lists), so the whole fetch is a single round trip.
+    """
     print("Fetching Open-Meteo recent data...")
-    
+
     today = datetime.now(timezone.utc)
     start = (today - timedelta(days=10)).strftime("%Y-%m-%d")
     end = today.strftime("%Y-%m-%d")
-    
-    all_data = {}
+
+    lat_csv = ",".join(str(lat) for lat, _ in SAMPLE_GRID)
+    lon_csv = ",".join(str(lon) for _, lon in SAMPLE_GRID)
+    url = (f"https://archive-api.open-meteo.com/v1/archive"
+           f"?latitude={lat_csv}&longitude={lon_csv}"
+           f"&start_date={start}&end_date={end}"
+           f"&daily=temperature_2m_mean&timezone=UTC")
+
     success = 0
-    
-    for lat, lon in SAMPLE_GRID:
-        url = (f"https://archive-api.open-meteo.com/v1/archive"
-               f"?latitude={lat}&longitude={lon}"
-               f"&start_date={start}&end_date={end}"
-               f"&daily=temperature_2m_mean&timezone=UTC")
-        data = fetch_json(url)
+
+    async with _async_client() as client:
+        try:
+            r = await client.get(url, timeout=30)
+            responses = r.json()
+        except (httpx.HTTPError, ValueError):
+            responses = None
+
+    if not isinstance(responses, list):
+        responses = []
+
+    # Running weighted sums per day: agg[date] = [sum(temp*w), sum(w)]
+    agg = defaultdict(lambda: [0.0, 0.0])
+    for i, data in enumerate(responses):
         if not data or "daily" not in data:
             continue
-        
-        weight = math.cos(math.radians(lat))
-        for date, temp in zip(data["daily"].get("time", []), 
+
+        weight = float(_GRID_WEIGHTS[i])
+        for date, temp in zip(data["daily"].get("time", []),
                               data["daily"].get("temperature_2m_mean", [])):
             if temp is not None:
-                if date not in all_data:
-                    all_data[date] = []
-                all_data[date].append((temp, weight))
+                entry = agg[date]
+                entry[0] += temp * weight
+                entry[1] += weight
         success += 1
-        time.sleep(0.03)
-    
-    # Weighted average per day
-    result = {}
-    for date, readings in all_data.items():
-        total_w = sum(w for _, w in readings)
-        if total_w > 0:
-            result[date] = sum(t * w for t, w in readings) / total_w
-    
+
+    result = {date: s / w for date, (s, w) in agg.items() if w > 0}
+
     print(f"  Got {len(result)} days from {success}/{len(SAMPLE_GRID)} grid points")
     return result
 
 
+def fetch_openmeteo_recent() -> Dict[str, float]:
+    """Sync entry point for the async Open-Meteo fetch."""
+    return asyncio.run(fetch_openmeteo_recent_async())
+
+
 def fetch_oni_data() -> Dict[str, float]:
     print("Fetching ENSO (ONI) data...")
-    text = fetch_text(ONI_URL)
+    text = cached_fetch(ONI_URL, ONI_TTL, parser=str)
     if not text:
         return {}
     
@@ -154,7 +311,11 @@ def get_current_enso_state(oni_data: Dict[str, float]) -> Dict:
     if not oni_data:
         return {"state": "neutral", "oni": 0.0, "impact": 0.0}
     
-    latest = max(oni_data.keys(), key=lambda x: (int(x.split('_')[1]), x.split('_')[0]))
+    # Split each "SEAS_YEAR" key once instead of twice per comparison
+    parsed = [(int(year), seas, key)
+              for key in oni_data
+              for seas, year in [key.split('_')]]
+    latest = max(parsed)[2]
     oni = oni_data[latest]
     
     if oni >= 0.5:
@@ -168,76 +329,102 @@ def get_current_enso_state(oni_data: Dict[str, float]) -> Dict:
             "description": f"{state.replace('_', ' ').title()} (ONI: {oni})"}
 
 
+def _era5_to_array(era5_data: Dict):
+    """Tabulate the ERA5 dict-of-lists as a (n_years, 366) float array.
+
+    Missing/short days become NaN so every downstream statistic is a
+    nan-aware NumPy reduction instead of a per-year list comprehension.
+    """
+    years = sorted(int(y) for y in era5_data if y.isdigit())
+    arr = np.full((len(years), 366), np.nan)
+    for i, year in enumerate(years):
+        # Rows arrive as float32 with NaN from the fetch layer; None-padded
+        # lists (older callers) coerce the same way
+        row = np.asarray(era5_data[str(year)], dtype=float)[:366]
+        arr[i, :len(row)] = row
+    return np.array(years), arr
+
+
+def _year_summary(arr: np.ndarray, days_so_far: int):
+    """Per-year (ytd_mean, full_mean, valid counts) in one vectorized pass.
+
+    Every downstream statistic (comparisons, baselines, drift) reads from
+    this table instead of rescanning the daily series.
+    """
+    # One sweep over the table: the YTD window is a prefix of the full
+    # window, so full-year sums/counts extend the YTD accumulators with
+    # the remaining days instead of rescanning the whole array
+    valid = np.isfinite(arr)
+    filled = np.where(valid, arr, 0.0)
+
+    ytd_counts = valid[:, :days_so_far].sum(axis=1)
+    ytd_sums = filled[:, :days_so_far].sum(axis=1)
+    full_counts = ytd_counts + valid[:, days_so_far:365].sum(axis=1)
+    full_sums = ytd_sums + filled[:, days_so_far:365].sum(axis=1)
+
+    ytd_means = np.where(ytd_counts > 0, ytd_sums / np.maximum(ytd_counts, 1), np.nan)
+    full_means = np.where(full_counts > 0, full_sums / np.maximum(full_counts, 1), np.nan)
+    return ytd_means, full_means, ytd_counts, full_counts
+
+
 def get_2026_progress(era5_data: Dict) -> Dict:
     """Calculate 2026 progress using ERA5 data only."""
-    year_2026 = era5_data.get("2026", [])
-    valid_temps = [t for t in year_2026 if t is not None]
-    
-    if not valid_temps:
+    years, arr = _era5_to_array(era5_data)
+    if 2026 not in years:
         return None
-    
-    days_so_far = len(valid_temps)
-    mean_temp = statistics.mean(valid_temps)
-    
+
+    row_2026 = arr[years == 2026][0]
+    valid_2026 = row_2026[np.isfinite(row_2026)]
+    if valid_2026.size == 0:
+        return None
+
+    days_so_far = int(valid_2026.size)
+    mean_temp = float(valid_2026.mean())
+
+    ytd_means, full_means, ytd_counts, full_counts = _year_summary(arr, days_so_far)
+
     # Compare with other years (same number of days)
     comparisons = {}
-    for year_str, temps in era5_data.items():
-        if year_str == "2026" or not year_str.isdigit():
+    for i, year in enumerate(years):
+        if year == 2026 or year < 2015:
             continue
-        if int(year_str) < 2015:
-            continue
-        year_temps = [t for t in temps[:days_so_far] if t is not None]
-        if year_temps:
-            comparisons[year_str] = {
-                "mean": statistics.mean(year_temps),
-                "diff_vs_2026": mean_temp - statistics.mean(year_temps)
+        if ytd_counts[i] > 0:
+            comparisons[str(year)] = {
+                "mean": float(ytd_means[i]),
+                "diff_vs_2026": mean_temp - float(ytd_means[i])
             }
-    
+
     # Baseline
-    baseline_years = [era5_data.get(str(y), []) for y in range(2020, 2024)]
-    baseline_temps = [statistics.mean([t for t in temps[:days_so_far] if t])
-                      for temps in baseline_years if any(t for t in temps[:days_so_far] if t)]
-    baseline_mean = statistics.mean(baseline_temps) if baseline_temps else 12.5
-    
+    mask_recent = (years >= 2020) & (years <= 2023) & (ytd_counts > 0)
+    baseline_mean = float(ytd_means[mask_recent].mean()) if mask_recent.any() else 12.5
+
     # Historical variability - using ANOMALY drift (not raw temp drift)
     # This removes seasonal effects by comparing to period-specific baselines
-    
-    # Calculate baselines for YTD and full year periods
-    baseline_ytd_temps = []
-    baseline_full_temps = []
-    for y in range(1991, 2021):
-        y_temps = era5_data.get(str(y), [])
-        if len(y_temps) >= days_so_far:
-            baseline_ytd_temps.extend([t for t in y_temps[:days_so_far] if t is not None])
-        if len(y_temps) >= 365:
-            baseline_full_temps.extend([t for t in y_temps[:365] if t is not None])
-    
-    baseline_ytd = statistics.mean(baseline_ytd_temps) if baseline_ytd_temps else 12.5
-    baseline_full = statistics.mean(baseline_full_temps) if baseline_full_temps else 14.0
-    
-    # Calculate how anomalies drift from YTD to full year
-    diffs = []
-    for year in range(2015, 2025):
-        y_temps = era5_data.get(str(year), [])
-        valid_ytd = [t for t in y_temps[:days_so_far] if t is not None]
-        valid_full = [t for t in y_temps[:365] if t is not None]
-        
-        if len(valid_ytd) >= days_so_far * 0.8 and len(valid_full) >= 300:
-            ytd_anomaly = statistics.mean(valid_ytd) - baseline_ytd
-            full_anomaly = statistics.mean(valid_full) - baseline_full
-            diffs.append(full_anomaly - ytd_anomaly)  # Anomaly drift
-    
+
+    # Pooled 1991-2020 baselines for YTD and full year periods
+    mask_base = (years >= 1991) & (years <= 2020)
+    base_ytd_vals = arr[mask_base, :days_so_far]
+    base_full_vals = arr[mask_base, :365]
+    baseline_ytd = float(np.nanmean(base_ytd_vals)) if np.isfinite(base_ytd_vals).any() else 12.5
+    baseline_full = float(np.nanmean(base_full_vals)) if np.isfinite(base_full_vals).any() else 14.0
+
+    # How anomalies drift from YTD to full year
+    mask_drift = ((years >= 2015) & (years <= 2024)
+                  & (ytd_counts >= days_so_far * 0.8) & (full_counts >= 300))
+    diffs = ((full_means[mask_drift] - baseline_full)
+             - (ytd_means[mask_drift] - baseline_ytd))
+
     return {
         "days_so_far": days_so_far,
-        "latest_temp": valid_temps[-1],
+        "latest_temp": float(valid_2026[-1]),
         "mean_2026_ytd": mean_temp,
         "baseline_mean": baseline_mean,
         "raw_anomaly": mean_temp - baseline_mean,
         "comparisons": comparisons,
         "historical_variability": {
-            "std": statistics.stdev(diffs) if len(diffs) > 1 else 0.15,
-            "mean_drift": statistics.mean(diffs) if diffs else 0.0,
-            "samples": len(diffs)
+            "std": float(np.std(diffs, ddof=1)) if diffs.size > 1 else 0.15,
+            "mean_drift": float(diffs.mean()) if diffs.size else 0.0,
+            "samples": int(diffs.size)
         }
     }
 
@@ -269,7 +456,8 @@ def get_openmeteo_trend(om_data: Dict[str, float], era5_days: int) -> Dict:
     avg = statistics.mean(temps)
     
     # Compare with earlier days in Open-Meteo data
-    earlier = [t for d, t in sorted_days if d not in [x[0] for x in recent_temps]]
+    recent_dates_set = {d for d, _ in recent_temps}
+    earlier = [t for d, t in sorted_days if d not in recent_dates_set]
     earlier_avg = statistics.mean(earlier) if earlier else avg
     
     trend = avg - earlier_avg
@@ -290,50 +478,48 @@ def monte_carlo_ranking(progress: Dict, enso: Dict, n_sim: int = 10000) -> Dict[
     std = progress["historical_variability"]["std"]
     drift = progress["historical_variability"]["mean_drift"]
     enso_impact = enso.get("impact", 0)
-    
+
     days_remaining = 365 - progress["days_so_far"]
     uncertainty = std * math.sqrt(days_remaining / 365)
-    
+
     diff_2024 = comparisons.get("2024", {}).get("diff_vs_2026", 0)
     diff_2023 = comparisons.get("2023", {}).get("diff_vs_2026", 0)
     diff_2020 = comparisons.get("2020", {}).get("diff_vs_2026", 0)
-    
-    counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 0}
-    
-    for _ in range(n_sim):
-        noise = random.gauss(0, uncertainty)
-        adj = drift + noise + enso_impact * random.uniform(0.5, 1.5)
-        
-        f_2024 = diff_2024 + adj
-        f_2023 = diff_2023 + adj
-        f_2020 = diff_2020 + adj
-        
-        if f_2024 > 0:
-            rank = 1
-        elif f_2023 > 0:
-            rank = 2
-        elif f_2020 > 0.02:
-            rank = 3
-        elif f_2020 > -0.03:
-            rank = random.choice([4, 5])
-        else:
-            rank = random.choice([5, 6])
-        
-        counts[rank] += 1
-    
-    return {k: v / n_sim for k, v in counts.items()}
+
+    # All draws batched; the rank cascade is a branchless np.where chain
+    rng = np.random.default_rng()
+    noise = rng.standard_normal(n_sim) * uncertainty
+    adj = drift + noise + enso_impact * rng.uniform(0.5, 1.5, n_sim)
+
+    f_2024 = diff_2024 + adj
+    f_2023 = diff_2023 + adj
+    f_2020 = diff_2020 + adj
+
+    ranks = np.where(f_2024 > 0, 1,
+             np.where(f_2023 > 0, 2,
+              np.where(f_2020 > 0.02, 3,
+               np.where(f_2020 > -0.03,
+                        4 + rng.integers(0, 2, n_sim),
+                        5 + rng.integers(0, 2, n_sim)))))
+
+    counts = np.bincount(ranks, minlength=7)
+    return {k: int(counts[k]) / n_sim for k in range(1, 7)}
 
 
 def fetch_polymarket_odds() -> List[Dict]:
     print("Fetching Polymarket markets...")
-    
-    data = fetch_json(f"{GAMMA_API}/markets?limit=100")
+
+    # Gamma /markets has no documented free-text search (that lives on
+    # /public-search), so narrow server-side with the documented
+    # closed=false filter and keep the cheap keyword scan client-side
+    data = cached_fetch(f"{GAMMA_API}/markets?limit=100&closed=false",
+                        POLYMARKET_TTL)
     if not data:
         return []
-    
+
     markets = []
     keywords = ["hottest", "temperature", "warmest", "2026"]
-    
+
     for m in data:
         q = m.get("question", "").lower()
         if any(kw in q for kw in keywords):
@@ -349,31 +535,35 @@ def fetch_polymarket_odds() -> List[Dict]:
                 "volume": m.get("volume", 0),
                 "url": f"https://polymarket.com/event/{m.get('slug', '')}"
             })
-    
+
     return markets
 
 
+# One alternation scan instead of a per-pattern substring loop; spaced
+# and hyphenated variants normalize to the same key
+_RANK_RE = re.compile(r"hottest year|second[- ]hottest|third[- ]hottest"
+                      r"|fourth[- ]hottest|fifth[- ]hottest|sixth[- ]hottest")
+_RANK_MAP = {
+    "hottest year": 1, "second-hottest": 2, "third-hottest": 3,
+    "fourth-hottest": 4, "fifth-hottest": 5, "sixth-hottest": 6,
+}
+
+
 def calculate_edges(mc_probs: Dict[int, float], markets: List[Dict]) -> List[Dict]:
-    rank_patterns = {
-        "hottest year": 1, "second-hottest": 2, "second hottest": 2,
-        "third-hottest": 3, "fourth-hottest": 4, "fifth-hottest": 5,
-        "sixth-hottest": 6, "sixth hottest": 6,
-    }
-    
     edges = []
     for m in markets:
         if m["yes_price"] is None:
             continue
-        
+
         q = m["question"].lower()
         market_prob = m["yes_price"] * 100
         our_prob, rank = None, None
-        
-        for pattern, r in rank_patterns.items():
-            if pattern in q:
-                rank = r
-                our_prob = mc_probs.get(r, 0) * 100
-                break
+
+        match = _RANK_RE.search(q)
+        if match:
+            token = match.group(0)
+            rank = _RANK_MAP[token if token == "hottest year" else token.replace(" ", "-")]
+            our_prob = mc_probs.get(rank, 0) * 100
         
         if "sixth" in q and "or lower" in q:
             our_prob = sum(mc_probs.get(r, 0) for r in [6]) * 100
@@ -396,18 +586,25 @@ def calculate_edges(mc_probs: Dict[int, float], markets: List[Dict]) -> List[Dic
     return sorted(edges, key=lambda x: abs(x["edge"]), reverse=True)
 
 
-def main():
+async def main_async():
     print("=" * 60)
     print("Climate Edge Detector v3 - Real-time Supplement")
     print("=" * 60)
-    
-    era5_data = fetch_era5_data()
+
+    # The four upstreams are independent until aggregation: fetch them
+    # concurrently so wall time is the slowest fetch, not the sum. The
+    # cached sync fetchers run in threads to keep their disk-cache path.
+    era5_data, om_data, oni_data, markets = await asyncio.gather(
+        asyncio.to_thread(fetch_era5_data),
+        fetch_openmeteo_recent_async(),
+        asyncio.to_thread(fetch_oni_data),
+        asyncio.to_thread(fetch_polymarket_odds),
+    )
+
     if not era5_data:
         print("ERROR: Could not fetch ERA5 data")
         return
-    
-    om_data = fetch_openmeteo_recent()
-    oni_data = fetch_oni_data()
+
     enso = get_current_enso_state(oni_data)
     
     print(f"\n📊 ENSO: {enso['description']}")
@@ -444,7 +641,6 @@ def main():
         print(f"   #{rank}: {prob:5.1f}% {bar}")
     
     # Markets
-    markets = fetch_polymarket_odds()
     edges = calculate_edges(mc_probs, markets)
     
     if edges:
@@ -476,5 +672,9 @@ def main():
                 print(f"   Edge: {e['edge']:+.1f}%")
 
 
+def main():
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()
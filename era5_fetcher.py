@@ -140,22 +140,25 @@ def calculate_global_mean(nc_file: str) -> float:
         Global mean temperature in Kelvin
     """
     ds = nc.Dataset(nc_file)
-    
-    # Get temperature (t2m) and coordinates
-    t2m = ds.variables['t2m'][:]  # Shape: (time, lat, lon)
+
+    # Get temperature (t2m) and coordinates; float32 halves the bytes
+    # pushed through cache on the full 0.25-degree grid
+    t2m = np.ma.filled(ds.variables['t2m'][:], np.nan).astype(np.float32, copy=False)
     lats = ds.variables['latitude'][:]
-    
+
     # Calculate area weights (cosine of latitude)
-    weights = np.cos(np.deg2rad(lats))
+    weights = np.cos(np.deg2rad(lats)).astype(np.float32)
     weights = weights / weights.sum()
-    
-    # Calculate weighted mean
-    # First average over longitude, then weighted average over latitude
-    lon_mean = np.nanmean(t2m, axis=-1)  # (time, lat)
-    global_mean = np.average(lon_mean, axis=-1, weights=weights)  # (time,)
-    
+
+    # One fused weighted pass (no intermediate lon-mean array); the
+    # denominator re-normalizes wherever cells are missing
+    w = weights[None, :, None]
+    num = np.nansum(t2m * w, axis=(1, 2))
+    den = np.sum(np.isfinite(t2m) * w, axis=(1, 2))
+    global_mean = num / den  # (time,)
+
     ds.close()
-    
+
     return float(np.mean(global_mean))
 
 
@@ -15,10 +15,18 @@ Resolution source: NASA GISS Global Land-Ocean Temperature Index
 https://data.giss.nasa.gov/gistemp/tabledata_v4/GLB.Ts+dSST.txt
 """
 
-import json
-import requests
+import asyncio
+import hashlib
+import httpx
+import numpy as np
+import orjson
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, Tuple
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Historical NASA GISS January data (anomaly in °C vs 1951-1980)
 GISS_JANUARY_HISTORICAL = {
@@ -30,15 +38,12 @@ GISS_JANUARY_HISTORICAL = {
     2000: 0.25, 1999: 0.48, 1998: 0.58, 1997: 0.32, 1996: 0.24,
 }
 
-# Market 1: Temperature brackets
-TEMP_BRACKETS = [
-    ("<1.00°C", lambda x: x < 1.00),
-    ("1.00-1.04°C", lambda x: 1.00 <= x < 1.05),
-    ("1.05-1.09°C", lambda x: 1.05 <= x < 1.10),
-    ("1.10-1.14°C", lambda x: 1.10 <= x < 1.15),
-    ("1.15-1.19°C", lambda x: 1.15 <= x < 1.20),
-    (">1.19°C", lambda x: x >= 1.20),
-]
+# Market 1: Temperature brackets as sorted edges + names (half-open on
+# the right, so exactly 1.05 lands in 1.05-1.09); the edges drive the
+# vectorized digitize and mirror the branch chain in _bracket_index
+_BRACKET_EDGES = (1.00, 1.05, 1.10, 1.15, 1.20)
+TEMP_BRACKETS = ("<1.00°C", "1.00-1.04°C", "1.05-1.09°C",
+                 "1.10-1.14°C", "1.15-1.19°C", ">1.19°C")
 
 # Current market odds (as of Jan 31, 2026)
 MARKET_ODDS_TEMP = {
@@ -58,30 +63,60 @@ MARKET_ODDS_RANKING = {
 }
 
 
+# Historical anomalies as a NumPy array, built once at import; float64
+# so exact-tie comparisons match the source dict bit-for-bit. The
+# descending copy feeds both the scalar ranking and the vectorized MC;
+# the negated ascending view is what searchsorted walks.
+_HIST_ANOM = np.array(list(GISS_JANUARY_HISTORICAL.values()))
+_SORTED_ANOM_DESC = -np.sort(-_HIST_ANOM)
+_SORTED_HIST_NEG = -_SORTED_ANOM_DESC
+
+
+# Scalar classifier cores as plain float compares over constants, so Numba
+# can lower them to native code when installed; without it they are still
+# cheap branch chains. String labels stay in the thin wrappers below
+# (nopython string handling isn't worth the trouble).
+def _bracket_index(anomaly: float) -> int:
+    if anomaly < 1.00:
+        return 0
+    elif anomaly < 1.05:
+        return 1
+    elif anomaly < 1.10:
+        return 2
+    elif anomaly < 1.15:
+        return 3
+    elif anomaly < 1.20:
+        return 4
+    return 5
+
+
+def _rank_index(anomaly: float, hist_desc: np.ndarray) -> int:
+    n_warmer = 0
+    for h in hist_desc:
+        if h >= anomaly:
+            n_warmer += 1
+            if n_warmer >= 3:
+                break
+        else:
+            break
+    return n_warmer
+
+
+if njit is not None:
+    _bracket_index = njit(cache=True)(_bracket_index)
+    _rank_index = njit(cache=True)(_rank_index)
+
+_RANK_LABELS = ("1st hottest", "2nd hottest", "3rd hottest", "4th or lower")
+
+
 def get_january_ranking(anomaly: float) -> str:
     """Determine where January 2026 would rank given an anomaly."""
-    sorted_years = sorted(GISS_JANUARY_HISTORICAL.items(), key=lambda x: x[1], reverse=True)
-    
-    for rank, (year, hist_anomaly) in enumerate(sorted_years, 1):
-        if anomaly > hist_anomaly:
-            if rank == 1:
-                return "1st hottest"
-            elif rank == 2:
-                return "2nd hottest"
-            elif rank == 3:
-                return "3rd hottest"
-            else:
-                return "4th or lower"
-    
-    return "4th or lower"
+    return _RANK_LABELS[_rank_index(anomaly, _SORTED_ANOM_DESC)]
 
 
 def get_temp_bracket(anomaly: float) -> str:
     """Determine which temperature bracket the anomaly falls into."""
-    for bracket_name, check_fn in TEMP_BRACKETS:
-        if check_fn(anomaly):
-            return bracket_name
-    return ">1.19°C"
+    return TEMP_BRACKETS[_bracket_index(anomaly)]
 
 
 def estimate_january_2026_from_openmeteo() -> Tuple[float, float]:
@@ -98,32 +133,45 @@ def estimate_january_2026_from_openmeteo() -> Tuple[float, float]:
         (30, 45), (-30, 45), (60, 0), (-60, 0),
     ]
     
-    def get_jan_mean(year: int) -> float:
-        temps = []
-        for lat, lon in sample_points:
-            try:
-                url = f"https://archive-api.open-meteo.com/v1/archive"
-                params = {
-                    "latitude": lat,
-                    "longitude": lon,
-                    "start_date": f"{year}-01-01",
-                    "end_date": f"{year}-01-30",
-                    "daily": "temperature_2m_mean",
-                }
-                resp = requests.get(url, params=params, timeout=10)
-                if resp.ok:
-                    data = resp.json()
-                    daily = data.get("daily", {}).get("temperature_2m_mean", [])
-                    valid = [t for t in daily if t is not None]
-                    if valid:
-                        temps.extend(valid)
-            except:
-                pass
+    async def fetch_year(client, year: int):
+        # One batched multi-location request covers every sample point
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in sample_points),
+            "longitude": ",".join(str(lon) for _, lon in sample_points),
+            "start_date": f"{year}-01-01",
+            "end_date": f"{year}-01-30",
+            "daily": "temperature_2m_mean",
+        }
+        try:
+            resp = await client.get("https://archive-api.open-meteo.com/v1/archive",
+                                    params=params)
+            resp.raise_for_status()
+            return year, resp.json()
+        except (httpx.HTTPError, ValueError):
+            return year, None
+
+    async def gather_years(years):
+        # All year batches multiplex over one HTTP/2 connection, with
+        # connect-level retries for Open-Meteo hiccups
+        limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=3)
+        async with httpx.AsyncClient(timeout=30, transport=transport) as client:
+            return await asyncio.gather(*[fetch_year(client, y) for y in years])
+
+    def jan_mean_from(data) -> float:
+        if data is None:
+            return None
+        if isinstance(data, dict):
+            data = [data]
+        temps = [t for series in data
+                 for t in (series.get("daily", {}).get("temperature_2m_mean") or [])
+                 if t is not None]
         return sum(temps) / len(temps) if temps else None
-    
-    jan_2026 = get_jan_mean(2026)
-    jan_2025 = get_jan_mean(2025)
-    jan_2024 = get_jan_mean(2024)
+
+    responses = dict(asyncio.run(gather_years([2026, 2025, 2024])))
+    jan_2026 = jan_mean_from(responses[2026])
+    jan_2025 = jan_mean_from(responses[2025])
+    jan_2024 = jan_mean_from(responses[2024])
     
     if not all([jan_2026, jan_2025]):
         return None, None
@@ -138,21 +186,22 @@ def estimate_january_2026_from_openmeteo() -> Tuple[float, float]:
     return estimated_anomaly, uncertainty
 
 
-def calculate_edge(our_prob: float, market_prob: float) -> Dict:
-    """Calculate trading edge and expected value."""
-    edge = our_prob - market_prob
-    
-    # Kelly criterion (simplified)
-    if edge > 0:
-        kelly = edge / (1 - market_prob) if market_prob < 1 else 0
-    else:
-        kelly = 0
-    
+def calculate_edges_vec(our: np.ndarray, market: np.ndarray) -> Dict:
+    """Trading edge and (simplified) Kelly across all outcomes at once.
+
+    Array in, arrays out -- one call covers a whole market, and the same
+    code path supports sensitivity sweeps over grids of probabilities.
+    """
+    edge = our - market
+    kelly = np.where((edge > 0) & (market < 1), edge / (1 - market), 0.0)
+    kelly = np.minimum(kelly, 0.25)  # Cap at 25% of bankroll
+    direction = np.where(edge > 0, "BUY YES",
+                         np.where(edge < -0.05, "BUY NO", "PASS"))
     return {
         "edge": edge,
         "edge_pct": edge * 100,
-        "direction": "BUY YES" if edge > 0 else ("BUY NO" if edge < -0.05 else "PASS"),
-        "kelly_fraction": min(kelly, 0.25),  # Cap at 25% of bankroll
+        "direction": direction,
+        "kelly_fraction": kelly,
     }
 
 
@@ -181,21 +230,25 @@ def run_analysis():
     print(f"   → Temperature bracket: {bracket}")
     print(f"   → Historical ranking: {ranking}")
     
-    # Monte Carlo simulation for probabilities
+    # Monte Carlo simulation for probabilities -- one vectorized draw,
+    # then counting via digitize (brackets) and searchsorted (ranks)
     print("\n🎲 Monte Carlo Simulation (10,000 runs)...")
-    import random
-    
-    temp_counts = {b[0]: 0 for b in TEMP_BRACKETS}
-    rank_counts = {"1st hottest": 0, "2nd hottest": 0, "3rd hottest": 0, "4th or lower": 0}
-    
+
     n_sims = 10000
-    for _ in range(n_sims):
-        sim_anomaly = random.gauss(estimated, uncertainty)
-        temp_counts[get_temp_bracket(sim_anomaly)] += 1
-        rank_counts[get_january_ranking(sim_anomaly)] += 1
-    
-    our_temp_probs = {k: v / n_sims for k, v in temp_counts.items()}
-    our_rank_probs = {k: v / n_sims for k, v in rank_counts.items()}
+    rng = np.random.default_rng()
+    sims = rng.normal(estimated, uncertainty, n_sims)
+
+    bracket_counts = np.bincount(np.digitize(sims, _BRACKET_EDGES), minlength=6)
+
+    # of historical Januaries at or above each sim -> 0=1st, 1=2nd, 2=3rd, 3+=4th+
+    n_warmer = np.searchsorted(_SORTED_HIST_NEG, -sims, side="right")
+    rank_counts = np.bincount(np.minimum(n_warmer, 3), minlength=4)
+
+    our_temp_probs = {name: int(c) / n_sims
+                      for name, c in zip(TEMP_BRACKETS, bracket_counts)}
+    rank_labels = ["1st hottest", "2nd hottest", "3rd hottest", "4th or lower"]
+    our_rank_probs = {label: int(c) / n_sims
+                      for label, c in zip(rank_labels, rank_counts)}
     
     # Calculate edges
     print("\n" + "=" * 60)
@@ -204,16 +257,18 @@ def run_analysis():
     print(f"{'Bracket':<15} {'Market':<10} {'Our Est.':<10} {'Edge':<10} {'Action':<10}")
     print("-" * 55)
     
-    for bracket_name, market_prob in MARKET_ODDS_TEMP.items():
-        our_prob = our_temp_probs.get(bracket_name, 0)
-        edge_info = calculate_edge(our_prob, market_prob)
-        
-        action = edge_info["direction"]
-        if abs(edge_info["edge"]) < 0.03:
+    market_temp = np.fromiter(MARKET_ODDS_TEMP.values(), dtype=float)
+    our_temp = np.fromiter((our_temp_probs.get(b, 0) for b in MARKET_ODDS_TEMP),
+                           dtype=float)
+    temp_edges = calculate_edges_vec(our_temp, market_temp)
+
+    for name, market_prob, our_prob, edge, edge_pct, action in zip(
+            MARKET_ODDS_TEMP, market_temp, our_temp,
+            temp_edges["edge"], temp_edges["edge_pct"], temp_edges["direction"]):
+        if abs(edge) < 0.03:
             action = "PASS"
-        
-        print(f"{bracket_name:<15} {market_prob*100:>6.1f}%    {our_prob*100:>6.1f}%    "
-              f"{edge_info['edge_pct']:>+6.1f}%   {action:<10}")
+        print(f"{name:<15} {market_prob*100:>6.1f}%    {our_prob*100:>6.1f}%    "
+              f"{edge_pct:>+6.1f}%   {action:<10}")
     
     print("\n" + "=" * 60)
     print("📈 MARKET 2: January Ranking")
@@ -221,16 +276,18 @@ def run_analysis():
     print(f"{'Outcome':<15} {'Market':<10} {'Our Est.':<10} {'Edge':<10} {'Action':<10}")
     print("-" * 55)
     
-    for outcome, market_prob in MARKET_ODDS_RANKING.items():
-        our_prob = our_rank_probs.get(outcome, 0)
-        edge_info = calculate_edge(our_prob, market_prob)
-        
-        action = edge_info["direction"]
-        if abs(edge_info["edge"]) < 0.03:
+    market_rank = np.fromiter(MARKET_ODDS_RANKING.values(), dtype=float)
+    our_rank = np.fromiter((our_rank_probs.get(o, 0) for o in MARKET_ODDS_RANKING),
+                           dtype=float)
+    rank_edges = calculate_edges_vec(our_rank, market_rank)
+
+    for outcome, market_prob, our_prob, edge, edge_pct, action in zip(
+            MARKET_ODDS_RANKING, market_rank, our_rank,
+            rank_edges["edge"], rank_edges["edge_pct"], rank_edges["direction"]):
+        if abs(edge) < 0.03:
             action = "PASS"
-        
         print(f"{outcome:<15} {market_prob*100:>6.1f}%    {our_prob*100:>6.1f}%    "
-              f"{edge_info['edge_pct']:>+6.1f}%   {action:<10}")
+              f"{edge_pct:>+6.1f}%   {action:<10}")
     
     # Save state
     state = {
@@ -247,10 +304,25 @@ def run_analysis():
         },
     }
     
-    with open("january_2026_state.json", "w") as f:
-        json.dump(state, f, indent=2)
-    
-    print(f"\n✅ State saved to january_2026_state.json")
+    # Hash everything except the timestamp so an unchanged analysis
+    # doesn't rewrite the file (orjson also serializes numpy natively)
+    comparable = orjson.dumps({k: v for k, v in state.items() if k != "timestamp"},
+                              option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS)
+    state["_hash"] = hashlib.blake2b(comparable).hexdigest()
+
+    try:
+        with open("january_2026_state.json", "rb") as f:
+            old_hash = orjson.loads(f.read()).get("_hash")
+    except (OSError, orjson.JSONDecodeError):
+        old_hash = None
+
+    if old_hash == state["_hash"]:
+        print(f"\n✅ State unchanged, skipping write")
+    else:
+        payload = orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        with open("january_2026_state.json", "wb") as f:
+            f.write(payload)
+        print(f"\n✅ State saved to january_2026_state.json")
     
     return state
 